@@ -8,6 +8,8 @@ Consolidates all docs/ files into PANDA_CORE and renames directories with box-dr
 import os
 import shutil
 import sys
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 # Set UTF-8 encoding for stdout
@@ -32,116 +34,112 @@ SUBDIR_MAPPINGS = {
     "12_REFERENCE": "╚═══ REFERENCE ═══╝",
 }
 
-def map_file_to_category(file_path: Path, docs_dir: Path) -> str:
-    """Map a file to its target category directory name."""
-    relative_path = file_path.relative_to(docs_dir)
-    dir_name = relative_path.parent.name.lower()
-    file_name = relative_path.name.lower()
+# File name suffixes treated as markdown documents
+_MD_SUFFIXES = (".md", ".MD", ".markdown")
+
+def iter_md_files(root: str):
+    """Yield the paths of all markdown files under root using os.scandir."""
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        with os.scandir(current) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False) and entry.name.endswith(_MD_SUFFIXES):
+                    yield entry.path
+
+# Keyword rules for root-level files in docs/, evaluated in order. Keywords must be
+# lowercase literals since they are matched against the lowercased file name.
+ROOT_RULES: tuple[tuple[tuple[str, ...], str], ...] = (
+    (("getting_started", "setup", "environment"), SUBDIR_MAPPINGS["01_GETTING_STARTED"]),
+    (("architecture",), SUBDIR_MAPPINGS["02_ARCHITECTURE"]),
+    (("development", "build", "storybook", "wiki"), SUBDIR_MAPPINGS["03_DEVELOPMENT"]),
+    (("deployment",), SUBDIR_MAPPINGS["04_DEPLOYMENT"]),
+    (("security",), SUBDIR_MAPPINGS["05_SECURITY"]),
+    (("api",), SUBDIR_MAPPINGS["06_API_REFERENCE"]),
+    (("service",), SUBDIR_MAPPINGS["07_SERVICES"]),
+    (("test",), SUBDIR_MAPPINGS["08_TESTING"]),
+    (("audit", "cache", "dead_code"), SUBDIR_MAPPINGS["09_AUDITS_AND_REPORTS"]),
+    (("guide", "resend", "auto_config"), SUBDIR_MAPPINGS["10_GUIDES_AND_TUTORIALS"]),
+    (("migration",), SUBDIR_MAPPINGS["11_MIGRATION_GUIDES"]),
+)
+
+# Subdirectory-based mapping for files nested under docs/
+SUBDIR_RULES: dict[str, str] = {
+    "getting-started": SUBDIR_MAPPINGS["01_GETTING_STARTED"],
+    "architecture": SUBDIR_MAPPINGS["02_ARCHITECTURE"],
+    "development": SUBDIR_MAPPINGS["03_DEVELOPMENT"],
+    "deployment": SUBDIR_MAPPINGS["04_DEPLOYMENT"],
+    "security": SUBDIR_MAPPINGS["05_SECURITY"],
+    "api": SUBDIR_MAPPINGS["06_API_REFERENCE"],
+    "services": SUBDIR_MAPPINGS["07_SERVICES"],
+    "guides": SUBDIR_MAPPINGS["10_GUIDES_AND_TUTORIALS"],
+    "reference": SUBDIR_MAPPINGS["12_REFERENCE"],
+}
+
+DEFAULT_CATEGORY = SUBDIR_MAPPINGS["12_REFERENCE"]
+
+# Number of per-file log lines buffered before writing to stdout
+LOG_BATCH_SIZE = 500
+
+def map_file_to_category(file_path: str, docs_dir: str) -> str:
+    """Map a file to its target category directory name.
     
-    # Root level files in docs/
-    if dir_name == "." or dir_name == "":
-        if "getting_started" in file_name or "setup" in file_name or "environment" in file_name:
-            return SUBDIR_MAPPINGS["01_GETTING_STARTED"]
-        elif "architecture" in file_name:
-            return SUBDIR_MAPPINGS["02_ARCHITECTURE"]
-        elif "development" in file_name or "build" in file_name or "storybook" in file_name or "wiki" in file_name:
-            return SUBDIR_MAPPINGS["03_DEVELOPMENT"]
-        elif "deployment" in file_name:
-            return SUBDIR_MAPPINGS["04_DEPLOYMENT"]
-        elif "security" in file_name:
-            return SUBDIR_MAPPINGS["05_SECURITY"]
-        elif "api" in file_name:
-            return SUBDIR_MAPPINGS["06_API_REFERENCE"]
-        elif "service" in file_name:
-            return SUBDIR_MAPPINGS["07_SERVICES"]
-        elif "test" in file_name:
-            return SUBDIR_MAPPINGS["08_TESTING"]
-        elif "audit" in file_name or "cache" in file_name or "dead_code" in file_name:
-            return SUBDIR_MAPPINGS["09_AUDITS_AND_REPORTS"]
-        elif "guide" in file_name or "resend" in file_name or "auto_config" in file_name:
-            return SUBDIR_MAPPINGS["10_GUIDES_AND_TUTORIALS"]
-        elif "migration" in file_name:
-            return SUBDIR_MAPPINGS["11_MIGRATION_GUIDES"]
-        elif "product" in file_name or "reference" in file_name or "scrollbar" in file_name or "analytics" in file_name or "cloudflare" in file_name or "chat" in file_name:
-            return SUBDIR_MAPPINGS["12_REFERENCE"]
-        else:
-            return SUBDIR_MAPPINGS["12_REFERENCE"]
+    Only the file name and its immediate parent matter, so no relative path is
+    computed; docs_dir must be spelled the same way as the root passed to
+    iter_md_files so the parent comparison is a plain string check.
+    """
+    # Files nested under docs/ only depend on their immediate parent directory
+    parent = os.path.dirname(file_path)
+    if parent != docs_dir:
+        return SUBDIR_RULES.get(os.path.basename(parent).lower(), DEFAULT_CATEGORY)
     
-    # Subdirectory-based mapping
-    if dir_name == "getting-started":
-        return SUBDIR_MAPPINGS["01_GETTING_STARTED"]
-    elif dir_name == "architecture":
-        return SUBDIR_MAPPINGS["02_ARCHITECTURE"]
-    elif dir_name == "development":
-        return SUBDIR_MAPPINGS["03_DEVELOPMENT"]
-    elif dir_name == "deployment":
-        return SUBDIR_MAPPINGS["04_DEPLOYMENT"]
-    elif dir_name == "security":
-        return SUBDIR_MAPPINGS["05_SECURITY"]
-    elif dir_name == "api":
-        return SUBDIR_MAPPINGS["06_API_REFERENCE"]
-    elif dir_name == "services":
-        return SUBDIR_MAPPINGS["07_SERVICES"]
-    elif dir_name == "guides":
-        return SUBDIR_MAPPINGS["10_GUIDES_AND_TUTORIALS"]
-    elif dir_name == "reference":
-        return SUBDIR_MAPPINGS["12_REFERENCE"]
-    else:
-        return SUBDIR_MAPPINGS["12_REFERENCE"]
+    # Root level files in docs/
+    file_name = os.path.basename(file_path).lower()
+    for keywords, category in ROOT_RULES:
+        if any(keyword in file_name for keyword in keywords):
+            return category
+    return DEFAULT_CATEGORY
 
 def main():
     root_dir = Path(__file__).parent.parent
-    old_panda_core = root_dir / "╠═══ PANDA_CORE ═══╣"
-    new_panda_core = root_dir / "╠═══ PANDA_CORE ═══╣"
+    panda_core = root_dir / "╠═══ PANDA_CORE ═══╣"
     docs_dir = root_dir / "docs"
+    # String form used for path comparisons in the hot loops
+    docs_root = str(docs_dir)
     
     print("╔════════════════════════════════════════════════════════════╗")
     print("║  Documentation Consolidation & Directory Renaming        ║")
     print("╚════════════════════════════════════════════════════════════╝")
     print()
     
-    # Step 1: Rename main directory
-    print("Step 1: Renaming main PANDA_CORE directory...")
-    if old_panda_core.exists():
-        if new_panda_core.exists():
-            print("  Warning: Target directory already exists. Using existing directory.")
-            panda_core = new_panda_core
-        else:
-            try:
-                old_panda_core.rename(new_panda_core)
-                print("  ✓ Renamed main directory")
-                panda_core = new_panda_core
-            except Exception as e:
-                print(f"  ✗ Error renaming directory: {e}")
-                print("  Continuing with existing directory name...")
-                panda_core = old_panda_core
-    else:
-        if new_panda_core.exists():
-            print("  Main directory already renamed.")
-            panda_core = new_panda_core
-        else:
-            print("  ✗ PANDA_CORE directory not found!")
-            return
+    # Step 1: Locate main directory (already carries its box-drawing name)
+    print("Step 1: Locating main PANDA_CORE directory...")
+    if not panda_core.exists():
+        print("  ✗ PANDA_CORE directory not found!")
+        return
+    print("  Main directory already renamed.")
     
     # Step 2: Rename subdirectories
     print()
     print("Step 2: Renaming subdirectories with box-drawing symbols...")
+    # One directory listing instead of two exists() checks per mapping
+    with os.scandir(panda_core) as entries:
+        existing = {entry.name for entry in entries}
+    
     for old_name, new_name in SUBDIR_MAPPINGS.items():
-        old_path = panda_core / old_name
-        new_path = panda_core / new_name
-        
-        if old_path.exists():
-            if new_path.exists():
+        if old_name in existing:
+            if new_name in existing:
                 print(f"  Warning: {new_name} already exists. Skipping.")
             else:
                 try:
-                    old_path.rename(new_path)
+                    os.rename(panda_core / old_name, panda_core / new_name)
                     print(f"  ✓ Renamed {old_name} -> {new_name}")
                 except Exception as e:
                     print(f"  ✗ Error renaming {old_name}: {e}")
-        else:
-            if new_path.exists():
-                print(f"  {new_name} already exists.")
+        elif new_name in existing:
+            print(f"  {new_name} already exists.")
     
     # Step 3: Consolidate files from docs/
     print()
@@ -154,34 +152,68 @@ def main():
         error_count = 0
         
         # Get all markdown files
-        all_files = list(docs_dir.rglob("*.md"))
+        all_files = list(iter_md_files(docs_root))
+        
+        # Create every target directory once instead of per file
+        for category in SUBDIR_MAPPINGS.values():
+            (panda_core / category).mkdir(parents=True, exist_ok=True)
         
-        for file_path in all_files:
+        # Classify everything first so each target directory is resolved once
+        buckets: dict[str, list[str]] = defaultdict(list)
+        for file_entry in all_files:
+            buckets[map_file_to_category(file_entry, docs_root)].append(file_entry)
+        
+        def _move_one(file_entry: str, target_file: Path, target_category: str) -> tuple[bool, str]:
+            file_name = os.path.basename(file_entry)
             try:
-                target_category = map_file_to_category(file_path, docs_dir)
+                # Move file (plain rename on the same filesystem, copy fallback otherwise)
+                try:
+                    os.replace(file_entry, target_file)
+                except OSError:
+                    shutil.move(file_entry, str(target_file))
+                return True, f"  ✓ Moved: {file_name} -> {target_category}"
+            except Exception as e:
+                return False, f"  ✗ Error moving {file_name}: {e}"
+        
+        # Buffer per-file log lines and write them in batches rather than one print() each
+        log: list[str] = []
+        
+        max_workers = min(32, (os.cpu_count() or 1) * 4)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = []
+            for target_category, files in buckets.items():
                 target_dir = panda_core / target_category
                 
-                # Create target directory if it doesn't exist
-                target_dir.mkdir(parents=True, exist_ok=True)
+                # Names already present in the target directory (lowercased, so conflicts
+                # are also caught on case-insensitive filesystems). Names are allocated
+                # here on the main thread; only the renames run on the workers.
+                with os.scandir(target_dir) as entries:
+                    names = {entry.name.lower() for entry in entries}
                 
-                # Determine target file path
-                target_file = target_dir / file_path.name
-                
-                # Handle name conflicts
-                counter = 1
-                while target_file.exists():
-                    stem = file_path.stem
-                    suffix = file_path.suffix
-                    target_file = target_dir / f"{stem}_{counter}{suffix}"
-                    counter += 1
-                
-                # Move file
-                shutil.move(str(file_path), str(target_file))
-                moved_count += 1
-                print(f"  ✓ Moved: {file_path.name} -> {target_category}")
-            except Exception as e:
-                error_count += 1
-                print(f"  ✗ Error moving {file_path.name}: {e}")
+                for file_entry in files:
+                    # Handle name conflicts
+                    name = os.path.basename(file_entry)
+                    stem, suffix = os.path.splitext(name)
+                    counter = 1
+                    while name.lower() in names:
+                        name = f"{stem}_{counter}{suffix}"
+                        counter += 1
+                    names.add(name.lower())
+                    futures.append(executor.submit(_move_one, file_entry, target_dir / name, target_category))
+            
+            for future in as_completed(futures):
+                ok, message = future.result()
+                if ok:
+                    moved_count += 1
+                else:
+                    error_count += 1
+                log.append(f"{message}\n")
+                if len(log) >= LOG_BATCH_SIZE:
+                    sys.stdout.write("".join(log))
+                    log.clear()
+        
+        sys.stdout.write("".join(log))
+        sys.stdout.flush()
         
         print()
         print(f"  Summary: {moved_count} moved, {error_count} errors")
@@ -190,21 +222,29 @@ def main():
     print()
     print("Step 4: Cleaning up empty directories in docs/...")
     
+    # Tracks whether anything is left under docs/, so Step 5 needs no second walk
+    any_remaining = False
+    
     if docs_dir.exists():
-        # Get all directories, sorted by depth (deepest first)
-        all_dirs = sorted(docs_dir.rglob("*"), key=lambda p: len(str(p)), reverse=True)
+        # Walk bottom-up so children are handled before their parents
+        removed_dirs = set()
         removed_count = 0
         
-        for dir_path in all_dirs:
-            if dir_path.is_dir():
-                try:
-                    # Check if directory is empty
-                    if not any(dir_path.iterdir()):
-                        dir_path.rmdir()
-                        removed_count += 1
-                        print(f"  ✓ Removed empty directory: {dir_path.name}")
-                except Exception as e:
-                    print(f"  ✗ Error removing {dir_path.name}: {e}")
+        for dir_path, dir_names, file_names in os.walk(docs_dir, topdown=False):
+            # dir_names is listed before children are removed, so check against removed_dirs
+            if file_names or any(os.path.join(dir_path, name) not in removed_dirs for name in dir_names):
+                any_remaining = True
+                continue
+            if dir_path == docs_root:
+                continue
+            try:
+                os.rmdir(dir_path)
+                removed_dirs.add(dir_path)
+                removed_count += 1
+                print(f"  ✓ Removed empty directory: {os.path.basename(dir_path)}")
+            except Exception as e:
+                any_remaining = True
+                print(f"  ✗ Error removing {os.path.basename(dir_path)}: {e}")
         
         print(f"  Removed {removed_count} empty directories")
     
@@ -213,17 +253,16 @@ def main():
     print("Step 5: Checking if docs/ directory can be removed...")
     
     if docs_dir.exists():
-        remaining_files = list(docs_dir.rglob("*"))
-        if not remaining_files:
+        if any_remaining:
+            print("  Note: docs/ directory still contains items")
+            print("  These items were not moved. Please review manually.")
+        else:
             try:
                 docs_dir.rmdir()
                 print("  ✓ Removed empty docs/ directory")
-            except Exception as e:
+            except OSError as e:
                 print(f"  ✗ Error removing docs/ directory: {e}")
                 print("  Note: Some files may still remain. Please check manually.")
-        else:
-            print(f"  Note: docs/ directory still contains {len(remaining_files)} items")
-            print("  These items were not moved. Please review manually.")
     
     print()
     print("╔════════════════════════════════════════════════════════════╗")
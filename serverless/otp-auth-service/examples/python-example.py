@@ -1,87 +1,115 @@
 """
 Python Example - OTP Authentication Integration
 
-Example Flask server using the OTP Auth Service
+Example Quart (async Flask) server using the OTP Auth Service.
+Requires: pip install quart "httpx[http2]" orjson
 """
 
-from flask import Flask, request, jsonify, make_response
-import requests
+from quart import Quart, request
+import httpx
+import orjson
 import os
 
-app = Flask(__name__)
+app = Quart(__name__)
 
 OTP_API_KEY = os.getenv('OTP_API_KEY')
 OTP_BASE_URL = os.getenv('OTP_BASE_URL', 'https://otp-auth-service.workers.dev')
 
-def request_otp(email: str):
+# Built once at import; httpx does not mutate the headers mapping passed to it
+_API_HEADERS = {
+    'Content-Type': 'application/json',
+    'X-OTP-API-Key': OTP_API_KEY  # API keys go in X-OTP-API-Key header, NOT Authorization
+}
+
+# Shared async client so connections to the OTP service are pooled and
+# in-flight upstream calls don't each tie up a worker thread
+client = httpx.AsyncClient(base_url=OTP_BASE_URL, http2=True)
+
+@app.after_serving
+async def close_client():
+    await client.aclose()
+
+async def request_otp(email: str):
     """Request OTP code"""
-    response = requests.post(
-        f'{OTP_BASE_URL}/auth/request-otp',
-        headers={
-            'Content-Type': 'application/json',
-            'X-OTP-API-Key': OTP_API_KEY  # API keys go in X-OTP-API-Key header, NOT Authorization
-        },
+    response = await client.post(
+        '/auth/request-otp',
+        headers=_API_HEADERS,
         json={'email': email}
     )
     response.raise_for_status()
-    return response.json()
+    return orjson.loads(response.content)
 
-def verify_otp(email: str, otp: str):
+async def verify_otp(email: str, otp: str):
     """Verify OTP and get token"""
-    response = requests.post(
-        f'{OTP_BASE_URL}/auth/verify-otp',
-        headers={
-            'Content-Type': 'application/json',
-            'X-OTP-API-Key': OTP_API_KEY  # API keys go in X-OTP-API-Key header, NOT Authorization
-        },
+    response = await client.post(
+        '/auth/verify-otp',
+        headers=_API_HEADERS,
         json={'email': email, 'otp': otp}
     )
     response.raise_for_status()
-    return response.json()
+    return orjson.loads(response.content)
 
-def get_user_info(token: str):
+async def get_user_info(token: str):
     """Get user information - requires JWT token from verify_otp"""
-    response = requests.get(
-        f'{OTP_BASE_URL}/auth/me',
+    response = await client.get(
+        '/auth/me',
         headers={'Authorization': f'Bearer {token}'}  # JWT token goes in Authorization header
     )
     response.raise_for_status()
-    return response.json()
+    return orjson.loads(response.content)
+
+async def notify_logout(token: str):
+    """Invalidate the token upstream - failures are logged, not surfaced to the client"""
+    try:
+        await client.post(
+            '/auth/logout',
+            headers={'Authorization': f'Bearer {token}'}
+        )
+    except httpx.HTTPError as e:
+        app.logger.warning('Upstream logout failed: %s', e)
+
+def _json_response(payload):
+    """Serialize payload with orjson (much faster than the stdlib json behind jsonify)"""
+    return app.response_class(orjson.dumps(payload), mimetype='application/json')
+
+def _extract_bearer(header: str) -> str:
+    """Return the token from an 'Authorization: Bearer <token>' header, or ''"""
+    return header[7:] if header.startswith('Bearer ') else ''
 
 @app.route('/api/auth/request-otp', methods=['POST'])
-def handle_request_otp():
+async def handle_request_otp():
     try:
-        data = request.json
+        data = await request.get_json()
         email = data.get('email')
         
         if not email:
-            return jsonify({'error': 'Email required'}), 400
+            return _json_response({'error': 'Email required'}), 400
         
-        result = request_otp(email)
-        return jsonify(result)
-    except requests.exceptions.HTTPError as e:
-        return jsonify({'error': str(e)}), e.response.status_code
+        result = await request_otp(email)
+        return _json_response(result)
+    except httpx.HTTPStatusError as e:
+        return _json_response({'error': str(e)}), e.response.status_code
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return _json_response({'error': str(e)}), 500
 
 @app.route('/api/auth/verify-otp', methods=['POST'])
-def handle_verify_otp():
+async def handle_verify_otp():
     try:
-        data = request.json
+        data = await request.get_json()
         email = data.get('email')
         otp = data.get('otp')
         
         if not email or not otp:
-            return jsonify({'error': 'Email and OTP required'}), 400
+            return _json_response({'error': 'Email and OTP required'}), 400
         
-        result = verify_otp(email, otp)
+        result = await verify_otp(email, otp)
         
         # Set token in HTTP-only cookie
-        response = make_response(jsonify({
+        response = _json_response({
             'success': True,
             'userId': result['userId'],
             'email': result['email']
-        }))
+        })
         response.set_cookie(
             'auth_token',
             result['token'],
@@ -90,45 +118,42 @@ def handle_verify_otp():
             max_age=7 * 60 * 60  # 7 hours
         )
         return response
-    except requests.exceptions.HTTPError as e:
-        return jsonify({'error': str(e)}), e.response.status_code
+    except httpx.HTTPStatusError as e:
+        return _json_response({'error': str(e)}), e.response.status_code
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return _json_response({'error': str(e)}), 500
 
 @app.route('/api/user/me', methods=['GET'])
-def handle_get_me():
+async def handle_get_me():
     try:
         token = request.cookies.get('auth_token') or \
-                request.headers.get('Authorization', '').replace('Bearer ', '')
+                _extract_bearer(request.headers.get('Authorization', ''))
         
         if not token:
-            return jsonify({'error': 'Authentication required'}), 401
+            return _json_response({'error': 'Authentication required'}), 401
         
-        user = get_user_info(token)
-        return jsonify(user)
-    except requests.exceptions.HTTPError as e:
-        return jsonify({'error': str(e)}), e.response.status_code
+        user = await get_user_info(token)
+        return _json_response(user)
+    except httpx.HTTPStatusError as e:
+        return _json_response({'error': str(e)}), e.response.status_code
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return _json_response({'error': str(e)}), 500
 
 @app.route('/api/auth/logout', methods=['POST'])
-def handle_logout():
+async def handle_logout():
     try:
         token = request.cookies.get('auth_token') or \
-                request.headers.get('Authorization', '').replace('Bearer ', '')
+                _extract_bearer(request.headers.get('Authorization', ''))
         
         if token:
-            requests.post(
-                f'{OTP_BASE_URL}/auth/logout',
-                headers={'Authorization': f'Bearer {token}'}
-            )
+            # The cookie is cleared regardless of the upstream result, so don't wait on it
+            app.add_background_task(notify_logout, token)
         
-        response = make_response(jsonify({'success': True, 'message': 'Logged out'}))
+        response = _json_response({'success': True, 'message': 'Logged out'})
         response.set_cookie('auth_token', '', expires=0)
         return response
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return _json_response({'error': str(e)}), 500
 
 if __name__ == '__main__':
     app.run(port=int(os.getenv('PORT', 3000)))
-